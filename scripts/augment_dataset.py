@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Precompute deterministic augmented variants of a Bean Disease Uganda split.
+
+For every image listed in `beans/{subcategory}/sets/{split}.txt`, N variants
+are generated (random crop, horizontal/vertical flip, brightness, contrast
+and saturation jitter) on a process pool. Each variant's parameters are
+drawn from a RNG seeded by (seed, parent stem, variant index), so the output
+does not depend on the number of workers.
+
+License: CC BY 4.0 (see LICENSE). This script is distributed alongside the
+dataset and follows the same license terms. Cite the original dataset in publications.
+
+Output layout (default <root>/augmented):
+    {category}/{subcategory}/
+        packed/{split}.u8          # raw uint8 HWC pixels, one fixed-size record per variant
+        packed/{split}_index.json  # shape, dtype and per-record parent/params/label
+        csv/{stem}.csv             # same schema as the source CSVs
+        json/{stem}.json           # same schema as the source JSONs ("source": "augmented")
+        sets/{split}.txt           # augmented stems
+
+The pack is memory-mappable, e.g. with numpy:
+    np.memmap(pack, dtype=np.uint8, mode="r", shape=(count, size, size, 3))
+and convert_to_coco.py consumes the csv/json records directly:
+    python scripts/convert_to_coco.py --root augmented --out augmented/annotations --splits train
+Augmented records have no image file: their JSON "file_name" (and so the COCO
+file_name) is a pack reference such as "packed/train.u8#12", with the record
+index also given as "pack_index".
+
+Usage examples:
+    python scripts/augment_dataset.py --root . --variants 4 --seed 0
+    python scripts/augment_dataset.py --root . --variants 8 --size 224 --workers 8
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from convert_to_coco import find_image, parse_csv_boxes, read_split_list
+
+# Jitter ranges; factors are multiplicative, 1.0 leaves the image unchanged.
+CROP_SCALE = (0.6, 1.0)
+BRIGHTNESS = (0.8, 1.2)
+CONTRAST = (0.8, 1.2)
+SATURATION = (0.8, 1.2)
+
+
+def _sample_params(seed: int, stem: str, variant: int, width: int, height: int) -> Dict:
+    """Draw the transform parameters of one variant deterministically."""
+    rng = random.Random(f"{seed}:{stem}:{variant}")
+    side = int(round(min(width, height) * rng.uniform(*CROP_SCALE)))
+    x = rng.randint(0, width - side)
+    y = rng.randint(0, height - side)
+    return {
+        "crop": [x, y, side, side],
+        "hflip": rng.random() < 0.5,
+        "vflip": rng.random() < 0.5,
+        "brightness": round(rng.uniform(*BRIGHTNESS), 4),
+        "contrast": round(rng.uniform(*CONTRAST), 4),
+        "saturation": round(rng.uniform(*SATURATION), 4),
+    }
+
+
+def _apply(img, params: Dict, size: int):
+    """Apply transform parameters to a PIL RGB image."""
+    from PIL import Image, ImageEnhance
+
+    x, y, w, h = params["crop"]
+    out = img.crop((x, y, x + w, y + h)).resize((size, size), Image.BILINEAR)
+    if params["hflip"]:
+        out = out.transpose(Image.FLIP_LEFT_RIGHT)
+    if params["vflip"]:
+        out = out.transpose(Image.FLIP_TOP_BOTTOM)
+    out = ImageEnhance.Brightness(out).enhance(params["brightness"])
+    out = ImageEnhance.Contrast(out).enhance(params["contrast"])
+    out = ImageEnhance.Color(out).enhance(params["saturation"])
+    return out
+
+
+def _transform_box(bbox: List[float], params: Dict, size: int) -> Optional[List[float]]:
+    """Map an [x, y, w, h] box through crop, resize and flips; None if cropped away."""
+    cx, cy, cw, ch = params["crop"]
+    x0 = max(bbox[0], cx)
+    y0 = max(bbox[1], cy)
+    x1 = min(bbox[0] + bbox[2], cx + cw)
+    y1 = min(bbox[1] + bbox[3], cy + ch)
+    if x1 <= x0 or y1 <= y0:
+        return None
+    sx, sy = size / cw, size / ch
+    x0, x1 = (x0 - cx) * sx, (x1 - cx) * sx
+    y0, y1 = (y0 - cy) * sy, (y1 - cy) * sy
+    if params["hflip"]:
+        x0, x1 = size - x1, size - x0
+    if params["vflip"]:
+        y0, y1 = size - y1, size - y0
+    return [round(x0, 2), round(y0, 2), round(x1 - x0, 2), round(y1 - y0, 2)]
+
+
+def _augment_image(task: Tuple[str, str, List[Dict], int, int, int]) -> List[Dict]:
+    """Generate all variants of one parent image (runs in a worker process)."""
+    from PIL import Image
+
+    image_path, stem, boxes, variants, seed, size = task
+    with Image.open(image_path) as img:
+        rgb = img.convert("RGB")
+
+    results = []
+    for variant in range(variants):
+        params = _sample_params(seed, stem, variant, rgb.width, rgb.height)
+        out_boxes = []
+        for box in boxes:
+            bbox = _transform_box(box["bbox"], params, size)
+            if bbox is not None:
+                out_boxes.append({"bbox": bbox, "category_id": box["category_id"]})
+        results.append({
+            "stem": f"{stem}_aug{variant}",
+            "parent": stem,
+            "variant": variant,
+            "params": params,
+            "boxes": out_boxes,
+            "pixels": _apply(rgb, params, size).tobytes(),
+        })
+    return results
+
+
+def _fmt(value: float) -> str:
+    """Format a coordinate like the source CSVs: integers without a decimal part."""
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def _write_records(
+    out_sub: Path,
+    sample: Dict,
+    index: int,
+    split: str,
+    subcategory: str,
+    size: int,
+    record_bytes: int,
+) -> None:
+    """Write the per-image CSV and JSON records of one augmented sample."""
+    stem = sample["stem"]
+    with open(out_sub / "csv" / f"{stem}.csv", "w", encoding="utf-8") as f:
+        f.write("#item,x,y,width,height,label\n")
+        for idx, box in enumerate(sample["boxes"]):
+            x, y, w, h = (_fmt(v) for v in box["bbox"])
+            f.write(f"{idx},{x},{y},{w},{h},{box['category_id']}\n")
+
+    # Same layout as scripts/generate_coco_annotations.py, with deterministic
+    # ids (pack index based) instead of random ones and a file_name that
+    # references the record in the pack.
+    image_id = index + 1
+    category_id = sample["boxes"][0]["category_id"] if sample["boxes"] else 0
+    record = {
+        "info": {
+            "description": "data",
+            "version": "1.0",
+            "year": 2025,
+            "contributor": "search engine",
+            "source": "augmented",
+            "license": {
+                "name": "Creative Commons Attribution 4.0 International",
+                "url": "https://creativecommons.org/licenses/by/4.0/"
+            }
+        },
+        "images": [
+            {
+                "id": image_id,
+                "width": size,
+                "height": size,
+                "file_name": f"packed/{split}.u8#{index}",
+                "pack_index": index,
+                "size": record_bytes,
+                "format": "RAW",
+                "url": "",
+                "hash": "",
+                "status": "success"
+            }
+        ],
+        "annotations": [
+            {
+                "id": n + 1,
+                "image_id": image_id,
+                "category_id": box["category_id"],
+                "segmentation": [],
+                "area": round(box["bbox"][2] * box["bbox"][3], 2),
+                "bbox": box["bbox"]
+            }
+            for n, box in enumerate(sample["boxes"])
+        ],
+        "categories": [
+            {
+                "id": category_id,
+                "name": subcategory,
+                "supercategory": split
+            }
+        ]
+    }
+    with open(out_sub / "json" / f"{stem}.json", "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2, ensure_ascii=False)
+
+
+def _augment_split(
+    executor: ProcessPoolExecutor,
+    tasks: List[Tuple],
+    out_dir: Path,
+    split: str,
+    subcategory: str,
+    variants: int,
+    seed: int,
+    size: int,
+    workers: int,
+) -> int:
+    """Write the pack, records, split list and index of one split under out_dir.
+
+    The index is written last. Returns the number of packed variants.
+    """
+    for name in ("packed", "csv", "json", "sets"):
+        (out_dir / name).mkdir(parents=True, exist_ok=True)
+    record_bytes = size * size * 3
+    pack_path = out_dir / "packed" / f"{split}.u8"
+    records = []
+    # Keep a bounded window of tasks in flight so finished results never
+    # pile up beyond it, and consume them in submission order so the
+    # pack layout is deterministic.
+    window = workers * 2
+    pending = deque()
+    task_iter = iter(tasks)
+    with open(pack_path, "wb") as pack:
+        while True:
+            while len(pending) < window:
+                task = next(task_iter, None)
+                if task is None:
+                    break
+                pending.append(executor.submit(_augment_image, task))
+            if not pending:
+                break
+            for sample in pending.popleft().result():
+                index = len(records)
+                pack.write(sample["pixels"])
+                _write_records(out_dir, sample, index, split, subcategory, size, record_bytes)
+                records.append({
+                    "index": index,
+                    "offset": index * record_bytes,
+                    "stem": sample["stem"],
+                    "parent": sample["parent"],
+                    "variant": sample["variant"],
+                    "params": sample["params"],
+                    "label": subcategory,
+                    "category_id": sample["boxes"][0]["category_id"] if sample["boxes"] else 0,
+                })
+
+    (out_dir / "sets" / f"{split}.txt").write_text(
+        "\n".join(sorted(r["stem"] for r in records)) + "\n", encoding="utf-8"
+    )
+    index_data = {
+        "pack": pack_path.name,
+        "dtype": "uint8",
+        "shape": [size, size, 3],
+        "record_bytes": record_bytes,
+        "count": len(records),
+        "seed": seed,
+        "variants": variants,
+        "split": split,
+        "records": records,
+    }
+    index_path = out_dir / "packed" / f"{split}_index.json"
+    index_path.write_text(json.dumps(index_data, indent=2), encoding="utf-8")
+    return len(records)
+
+
+def _publish(staging: Path, out_sub: Path, split: str) -> None:
+    """Move a completed split from staging into out_sub, replacing the previous run.
+
+    Records of the previous run that the new run does not produce (e.g.
+    after lowering --variants) are removed. The old index is removed first
+    and the new one moved in last, so readers never see an index that
+    does not match the pack next to it.
+    """
+    old_stems = set(read_split_list(out_sub / "sets" / f"{split}.txt"))
+    new_stems = set(read_split_list(staging / "sets" / f"{split}.txt"))
+    index_name = f"{split}_index.json"
+    (out_sub / "packed" / index_name).unlink(missing_ok=True)
+    for stem in old_stems - new_stems:
+        (out_sub / "csv" / f"{stem}.csv").unlink(missing_ok=True)
+        (out_sub / "json" / f"{stem}.json").unlink(missing_ok=True)
+
+    for name in ("packed", "csv", "json", "sets"):
+        (out_sub / name).mkdir(exist_ok=True)
+    for name in ("csv", "json"):
+        for path in (staging / name).iterdir():
+            os.replace(path, out_sub / name / path.name)
+    os.replace(staging / "packed" / f"{split}.u8", out_sub / "packed" / f"{split}.u8")
+    os.replace(staging / "sets" / f"{split}.txt", out_sub / "sets" / f"{split}.txt")
+    os.replace(staging / "packed" / index_name, out_sub / "packed" / index_name)
+
+
+def augment(
+    root: Path,
+    out_root: Path,
+    category: str,
+    split: str,
+    variants: int,
+    seed: int,
+    size: int,
+    workers: int,
+) -> None:
+    """Generate packed augmented variants and their records for every subcategory."""
+    category_root = root / category
+    subcategories = sorted(
+        d.name for d in category_root.iterdir()
+        if d.is_dir() and d.name not in ['csv', 'json', 'images', 'sets', 'segmentations']
+    )
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for subcategory in subcategories:
+            subcategory_dir = category_root / subcategory
+            stems = read_split_list(subcategory_dir / "sets" / f"{split}.txt")
+            if not stems:
+                print(f"Warning: No {split} split for {subcategory}, skipping")
+                continue
+
+            tasks = []
+            for stem in stems:
+                image_path = find_image(subcategory_dir / "images", stem)
+                if image_path is None:
+                    print(f"Warning: No image found for {subcategory}/{stem}, skipping")
+                    continue
+                boxes = parse_csv_boxes(subcategory_dir / "csv" / f"{stem}.csv")
+                tasks.append((str(image_path), stem, boxes, variants, seed, size))
+
+            out_sub = out_root / category / subcategory
+            out_sub.mkdir(parents=True, exist_ok=True)
+            # Build the split in a staging directory and only move it into
+            # place once it is complete, so a failed run never leaves a
+            # truncated pack or partial records next to an older index.
+            staging = Path(tempfile.mkdtemp(prefix=f".{split}-", dir=out_sub))
+            try:
+                count = _augment_split(
+                    executor, tasks, staging, split, subcategory, variants, seed, size, workers
+                )
+                _publish(staging, out_sub, split)
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+            pack_path = out_sub / "packed" / f"{split}.u8"
+            print(f"Packed {count} variants of {len(tasks)} {subcategory} images into {pack_path}")
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None) -> int:
+    """Entry point for the augmentation CLI."""
+    parser = argparse.ArgumentParser(
+        prog=prog, description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--root",
+        type=Path,
+        default=Path(__file__).resolve().parent.parent,
+        help="Dataset root containing category subfolders (default: dataset root)",
+    )
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=None,
+        help="Output root for augmented data (default: <root>/augmented)",
+    )
+    parser.add_argument(
+        "--category",
+        type=str,
+        default="beans",
+        help="Category to augment (default: beans)",
+    )
+    parser.add_argument(
+        "--split",
+        type=str,
+        default="train",
+        help="Split to augment (default: train)",
+    )
+    parser.add_argument(
+        "--variants",
+        type=int,
+        default=4,
+        help="Augmented variants per image (default: 4)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Base random seed (default: 0)",
+    )
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=500,
+        help="Square output size in pixels (default: 500, the source resolution)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes (default: CPU count)",
+    )
+
+    args = parser.parse_args(argv)
+    if args.variants < 1:
+        parser.error("--variants must be at least 1")
+    if args.size < 1:
+        parser.error("--size must be at least 1")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    augment(
+        root=Path(args.root),
+        out_root=Path(args.out) if args.out else Path(args.root) / "augmented",
+        category=args.category,
+        split=args.split,
+        variants=args.variants,
+        seed=args.seed,
+        size=args.size,
+        workers=args.workers,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the Bean Disease Uganda dataset scripts.
+
+Subcommands are resolved lazily: only the module backing the selected
+subcommand is imported, so `--help` and no-op runs stay cheap.
+
+License: CC BY 4.0 (see LICENSE). This script is distributed alongside the
+dataset and follows the same license terms. Cite the original dataset in publications.
+
+Usage examples:
+    python scripts/bean_dataset.py --help
+    python scripts/bean_dataset.py convert --root . --out annotations --combined
+    python scripts/bean_dataset.py convert --root . --out annotations --incremental
+    python scripts/bean_dataset.py reorganize .
+    python scripts/bean_dataset.py generate .
+    python scripts/bean_dataset.py augment --variants 4 --seed 0
+    python scripts/bean_dataset.py serve --port 8765
+    python scripts/bean_dataset.py load-test --requests 500
+"""
+
+import sys
+from typing import List, Optional
+
+# Subcommand name -> (module in scripts/, one-line help). Modules are only
+# imported once their subcommand is selected.
+SUBCOMMANDS = {
+    "convert": ("convert_to_coco", "Convert per-image CSV annotations to COCO JSON"),
+    "reorganize": ("reorganize_dataset", "Reorganize data/origin/ into the beans/ structure"),
+    "generate": ("generate_coco_annotations", "Generate per-image JSON annotations in data/origin/"),
+    "augment": ("augment_dataset", "Precompute packed augmented variants of a split"),
+    "serve": ("serve_samples", "Serve preprocessed samples from a warm worker pool"),
+    "load-test": ("load_test_samples", "Load-test a running sample server"),
+}
+
+
+def _usage() -> str:
+    """Return the top-level help text without importing any subcommand."""
+    width = max(len(name) for name in SUBCOMMANDS)
+    lines = [
+        "usage: bean_dataset.py [-h] <command> [<args>]",
+        "",
+        "Bean Disease Uganda dataset tools.",
+        "",
+        "commands:",
+    ]
+    for name, (_, help_text) in SUBCOMMANDS.items():
+        lines.append(f"  {name.ljust(width)}  {help_text}")
+    lines.append("")
+    lines.append("Run 'bean_dataset.py <command> --help' for command options.")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Dispatch to the selected subcommand's main()."""
+    args = sys.argv[1:] if argv is None else list(argv)
+
+    # argparse is deliberately avoided here; it costs more to import than
+    # the whole dispatch and the subcommands parse their own options.
+    if not args or args[0] in ("-h", "--help"):
+        if not args:
+            print(_usage(), file=sys.stderr)
+            return 2
+        print(_usage())
+        return 0
+
+    command, rest = args[0], args[1:]
+    if command not in SUBCOMMANDS:
+        print(_usage(), file=sys.stderr)
+        print(f"\nbean_dataset.py: error: unknown command {command!r}", file=sys.stderr)
+        return 2
+
+    from importlib import import_module
+
+    module = import_module(SUBCOMMANDS[command][0])
+    # Pass the full invocation so subcommand usage and errors read
+    # "bean_dataset.py <command> ..." rather than "bean_dataset.py ...".
+    return module.main(rest, prog=f"bean_dataset.py {command}")
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Compare memory of dict-based and columnar COCO builds on synthetic data.
+
+Builds the same synthetic dataset twice, once as lists of COCO dicts (the
+layout convert_to_coco.py used to keep in memory) and once in a
+CocoRecordStore, and reports the memory added by the build and the peak
+while serializing to JSON. Each layout runs in its own subprocess and is
+measured by peak RSS; tracemalloc's per-allocation bookkeeping is too heavy
+for million-record builds.
+
+License: CC BY 4.0 (see LICENSE). This script is distributed alongside the
+dataset and follows the same license terms. Cite the original dataset in publications.
+
+Usage examples:
+    python scripts/bench_annotation_memory.py
+    python scripts/bench_annotation_memory.py --annotations 1000000 --per-image 4
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from coco_records import CocoRecordStore, write_coco_json
+
+
+def _synthetic_rows(num_annotations: int, per_image: int):
+    """Yield (image_id, file_name, ann_id, category_id, bbox, area) rows."""
+    for i in range(num_annotations):
+        image_id = i // per_image + 1
+        x, y = float(i % 97), float(i % 89)
+        w, h = 32.0 + i % 200, 24.0 + i % 150
+        file_name = f"beans/healthy/images/healthy_train_{image_id - 1}.jpg"
+        yield image_id, file_name, i + 1, i % 3 + 1, [x, y, w, h], w * h
+
+
+def _build_dicts(num_annotations: int, per_image: int) -> Tuple[List[Dict], List[Dict]]:
+    images: List[Dict] = []
+    anns: List[Dict] = []
+    for image_id, file_name, ann_id, category_id, bbox, area in _synthetic_rows(
+        num_annotations, per_image
+    ):
+        if image_id > len(images):
+            images.append({"id": image_id, "file_name": file_name, "width": 500, "height": 500})
+        anns.append({
+            "id": ann_id,
+            "image_id": image_id,
+            "category_id": category_id,
+            "bbox": bbox,
+            "area": area,
+            "iscrowd": 0,
+        })
+    return images, anns
+
+
+def _build_store(num_annotations: int, per_image: int) -> CocoRecordStore:
+    store = CocoRecordStore()
+    for image_id, file_name, ann_id, category_id, bbox, area in _synthetic_rows(
+        num_annotations, per_image
+    ):
+        if image_id > store.num_images:
+            store.add_image(image_id, file_name, 500, 500)
+        store.add_annotation(ann_id, image_id, category_id, bbox, area)
+    return store
+
+
+def _peak_rss_mb() -> float:
+    """Return this process's peak resident set size in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def _dump_dicts(built: Tuple[List[Dict], List[Dict]], f) -> None:
+    images, anns = built
+    f.write(json.dumps({"images": images, "annotations": anns}, indent=2))
+
+
+def _dump_store(built: CocoRecordStore, f) -> None:
+    write_coco_json(f, {"images": built.iter_images(), "annotations": built.iter_annotations()})
+
+
+LAYOUTS = {
+    "dicts": (_build_dicts, _dump_dicts),
+    "store": (_build_store, _dump_store),
+}
+
+
+def _measure(layout: str, num_annotations: int, per_image: int) -> Dict[str, float]:
+    """Build and serialize one layout in this process and return its measurements."""
+    build, dump = LAYOUTS[layout]
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    built = build(num_annotations, per_image)
+    build_s = time.perf_counter() - start
+    after_build = _peak_rss_mb()
+    start = time.perf_counter()
+    with open(os.devnull, "w", encoding="utf-8") as f:
+        dump(built, f)
+    write_s = time.perf_counter() - start
+    return {
+        "build_s": build_s,
+        "write_s": write_s,
+        "build_mb": after_build - baseline,
+        "peak_mb": _peak_rss_mb() - baseline,
+    }
+
+
+def run(num_annotations: int, per_image: int) -> Dict[str, Dict[str, float]]:
+    """Measure every layout in a fresh subprocess and return the results."""
+    results = {}
+    for layout in LAYOUTS:
+        proc = subprocess.run(
+            [sys.executable, __file__, "--annotations", str(num_annotations),
+             "--per-image", str(per_image), "--layout", layout],
+            stdout=subprocess.PIPE,
+            text=True,
+            check=True,
+        )
+        results[layout] = json.loads(proc.stdout)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the memory benchmark CLI."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--annotations",
+        type=int,
+        default=1_000_000,
+        help="Number of synthetic annotations (default: 1000000)",
+    )
+    parser.add_argument(
+        "--per-image",
+        type=int,
+        default=1,
+        help="Annotations per synthetic image (default: 1, as in this dataset)",
+    )
+    parser.add_argument(
+        "--layout",
+        choices=sorted(LAYOUTS),
+        help=argparse.SUPPRESS,
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.layout:
+        # Child process: measure a single layout and report JSON to the parent.
+        print(json.dumps(_measure(args.layout, args.annotations, args.per_image)))
+        return 0
+
+    results = run(args.annotations, args.per_image)
+    print(f"{args.annotations} annotations, {args.per_image} per image")
+    print(f"{'layout':<8}{'build MB':>10}{'peak MB':>10}{'build s':>10}{'write s':>10}")
+    for name, r in results.items():
+        print(f"{name:<8}{r['build_mb']:>10.1f}{r['peak_mb']:>10.1f}"
+              f"{r['build_s']:>10.2f}{r['write_s']:>10.2f}")
+    for key, label in (("build_mb", "Build"), ("peak_mb", "Peak")):
+        ratio = results["dicts"][key] / max(results["store"][key], 1e-9)
+        print(f"{label} memory reduction: {ratio:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
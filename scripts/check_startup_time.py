@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Enforce the startup-time budget of scripts/bean_dataset.py.
+
+Runs `--help` and a no-op `convert --incremental` under `python -X importtime`,
+reports wall time and the most expensive imports, and exits non-zero when a
+run exceeds the budget or imports a module that must stay lazy (PIL).
+
+License: CC BY 4.0 (see LICENSE). This script is distributed alongside the
+dataset and follows the same license terms. Cite the original dataset in publications.
+
+Usage examples:
+    python scripts/check_startup_time.py
+    python scripts/check_startup_time.py --budget-ms 100 --repeat 7
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+CLI = SCRIPTS_DIR / "bean_dataset.py"
+# Top-level packages that the fast paths must never import.
+FORBIDDEN_IMPORTS = ("PIL",)
+
+
+def _parse_importtime(stderr: str) -> Dict[str, int]:
+    """Return cumulative import time in microseconds per module."""
+    cumulative: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, _, rest = line.partition(":")
+        _, cum, name = (part.strip() for part in rest.split("|"))
+        cumulative[name] = int(cum)
+    return cumulative
+
+
+def _measure(args: List[str], repeat: int) -> Tuple[float, Dict[str, int]]:
+    """Return (median wall ms, importtime of the last run) for a CLI call."""
+    walls = []
+    imports: Dict[str, int] = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", str(CLI), *args],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        walls.append((time.perf_counter() - start) * 1000.0)
+        if proc.returncode != 0:
+            raise SystemExit(f"Command failed ({proc.returncode}): {' '.join(args)}\n{proc.stderr}")
+        imports = _parse_importtime(proc.stderr)
+    return statistics.median(walls), imports
+
+
+def check(root: Path, budget_ms: float, repeat: int, top: int) -> bool:
+    """Run all startup checks and return True when every one passes."""
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        convert_args = [
+            "convert", "--root", str(root), "--out", tmp, "--combined", "--incremental",
+        ]
+        # Prime the output directory so the measured runs are no-ops.
+        subprocess.run(
+            [sys.executable, str(CLI), *convert_args], stdout=subprocess.DEVNULL, check=True
+        )
+
+        cases = [("--help", ["--help"]), ("convert --incremental (no-op)", convert_args)]
+        for label, args in cases:
+            wall_ms, imports = _measure(args, repeat)
+            top_level = {name: us for name, us in imports.items() if "." not in name}
+            forbidden = sorted(
+                name for name in top_level if name.split(".")[0] in FORBIDDEN_IMPORTS
+            )
+            passed = wall_ms <= budget_ms and not forbidden
+            ok = ok and passed
+
+            print(f"[{'PASS' if passed else 'FAIL'}] {label}: {wall_ms:.1f} ms "
+                  f"(budget {budget_ms:.0f} ms), imports {sum(top_level.values()) / 1000.0:.1f} ms")
+            for name, us in sorted(top_level.items(), key=lambda kv: -kv[1])[:top]:
+                print(f"    {us / 1000.0:7.2f} ms  {name}")
+            if forbidden:
+                print(f"    forbidden imports: {', '.join(forbidden)}")
+    return ok
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the startup budget check."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--root",
+        type=Path,
+        default=SCRIPTS_DIR.parent,
+        help="Dataset root containing category subfolders (default: dataset root)",
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=100.0,
+        help="Maximum median wall time per command in ms (default: 100)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Runs per command; the median is compared to the budget (default: 5)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=5,
+        help="Number of most expensive imports to list (default: 5)",
+    )
+
+    args = parser.parse_args(argv)
+
+    return 0 if check(args.root, args.budget_ms, args.repeat, args.top) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,157 @@
+"""
+Compact in-memory storage for COCO images and annotations.
+
+License: CC BY 4.0 (see LICENSE). This script is distributed alongside the
+dataset and follows the same license terms. Cite the original dataset in publications.
+
+A COCO build keeps every record until the output is written. Holding them as
+Python dicts costs several hundred bytes per record (a dict, string keys, a
+bbox list and boxed numbers), which is what makes multi-million annotation
+builds run out of memory. CocoRecordStore keeps the same fields in parallel
+typed arrays instead (ids, image ids, category ids, a flat N x 4 bbox array,
+areas) plus a file-name string table. COCO dicts are only materialized one
+record at a time while streaming JSON with write_coco_json().
+
+See scripts/bench_annotation_memory.py for a measured comparison.
+"""
+
+import json
+from array import array
+from itertools import islice
+from typing import Dict, IO, Iterator, Sequence
+
+# Records encoded per json.dumps() call when streaming; bounds the transient
+# memory of serialization while amortizing the per-call encoder setup.
+WRITE_CHUNK = 1024
+
+
+class CocoRecordStore:
+    """Columnar store of COCO images and annotations backed by typed arrays."""
+
+    __slots__ = (
+        "image_ids",
+        "image_name_blob",
+        "image_name_offsets",
+        "image_widths",
+        "image_heights",
+        "ann_ids",
+        "ann_image_ids",
+        "ann_category_ids",
+        "ann_bboxes",
+        "ann_areas",
+        "ann_iscrowd",
+    )
+
+    def __init__(self) -> None:
+        # Images: row i describes one image. File names live in a string
+        # table: one UTF-8 blob, name i spanning offsets[i]:offsets[i + 1].
+        self.image_ids = array("q")
+        self.image_name_blob = bytearray()
+        self.image_name_offsets = array("q", [0])
+        self.image_widths = array("i")
+        self.image_heights = array("i")
+        # Annotations: row i describes one annotation; bboxes are flattened
+        # as x, y, w, h so annotation i occupies ann_bboxes[4 * i:4 * i + 4].
+        self.ann_ids = array("q")
+        self.ann_image_ids = array("q")
+        self.ann_category_ids = array("i")
+        self.ann_bboxes = array("d")
+        self.ann_areas = array("d")
+        self.ann_iscrowd = array("b")
+
+    @property
+    def num_images(self) -> int:
+        return len(self.image_ids)
+
+    @property
+    def num_annotations(self) -> int:
+        return len(self.ann_ids)
+
+    def add_image(self, image_id: int, file_name: str, width: int, height: int) -> None:
+        """Append one image record."""
+        self.image_ids.append(image_id)
+        self.image_name_blob += file_name.encode("utf-8")
+        self.image_name_offsets.append(len(self.image_name_blob))
+        self.image_widths.append(width)
+        self.image_heights.append(height)
+
+    def add_annotation(
+        self,
+        ann_id: int,
+        image_id: int,
+        category_id: int,
+        bbox: Sequence[float],
+        area: float,
+        iscrowd: int = 0,
+    ) -> None:
+        """Append one annotation record with an [x, y, w, h] bbox."""
+        self.ann_ids.append(ann_id)
+        self.ann_image_ids.append(image_id)
+        self.ann_category_ids.append(category_id)
+        self.ann_bboxes.extend(bbox)
+        self.ann_areas.append(area)
+        self.ann_iscrowd.append(iscrowd)
+
+    def file_name(self, row: int) -> str:
+        """Return the file name of the image stored at row."""
+        offsets = self.image_name_offsets
+        return self.image_name_blob[offsets[row]:offsets[row + 1]].decode("utf-8")
+
+    def iter_images(self) -> Iterator[Dict]:
+        """Yield COCO image dicts one at a time."""
+        for i in range(len(self.image_ids)):
+            yield {
+                "id": self.image_ids[i],
+                "file_name": self.file_name(i),
+                "width": self.image_widths[i],
+                "height": self.image_heights[i],
+            }
+
+    def iter_annotations(self) -> Iterator[Dict]:
+        """Yield COCO annotation dicts one at a time."""
+        bboxes = self.ann_bboxes
+        for i in range(len(self.ann_ids)):
+            yield {
+                "id": self.ann_ids[i],
+                "image_id": self.ann_image_ids[i],
+                "category_id": self.ann_category_ids[i],
+                "bbox": bboxes[4 * i:4 * i + 4].tolist(),
+                "area": self.ann_areas[i],
+                "iscrowd": self.ann_iscrowd[i],
+            }
+
+    def nbytes(self) -> int:
+        """Return the number of bytes used by the store's buffers."""
+        arrays = (
+            self.image_ids, self.image_name_offsets, self.image_widths, self.image_heights,
+            self.ann_ids, self.ann_image_ids, self.ann_category_ids,
+            self.ann_bboxes, self.ann_areas, self.ann_iscrowd,
+        )
+        return sum(len(a) * a.itemsize for a in arrays) + len(self.image_name_blob)
+
+
+def write_coco_json(fp: IO[str], coco: Dict) -> None:
+    """Write a COCO dict to fp, streaming values that are iterators.
+
+    Lists, dicts and scalars are encoded as usual; any other iterable (for
+    example CocoRecordStore.iter_annotations()) is written element by
+    element. The output is identical to json.dumps(coco, indent=2).
+    """
+    fp.write("{")
+    for n, (key, value) in enumerate(coco.items()):
+        fp.write(("," if n else "") + "\n  " + json.dumps(key) + ": ")
+        if isinstance(value, (dict, list, str, int, float, bool)) or value is None:
+            fp.write(json.dumps(value, indent=2).replace("\n", "\n  "))
+            continue
+        items = iter(value)
+        empty = True
+        while True:
+            chunk = list(islice(items, WRITE_CHUNK))
+            if not chunk:
+                break
+            # Drop the chunk's own "[" and "\n]" and indent it one level deeper.
+            text = json.dumps(chunk, indent=2)[1:-2].replace("\n", "\n  ")
+            fp.write(("[" if empty else ",") + text)
+            empty = False
+        fp.write("[]" if empty else "\n  ]")
+    fp.write("\n}" if coco else "}")
@@ -11,24 +11,25 @@ Usage examples:
         --category beans --splits train val test
     python scripts/convert_to_coco.py --root . --out annotations \
         --category beans --splits train val test --combined
+    python scripts/convert_to_coco.py --root . --out annotations \
+        --category beans --splits train val test --incremental
 """
 
 import argparse
 import csv
 import json
-import sys
+import os
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-from PIL import Image
-
+from coco_records import CocoRecordStore, write_coco_json
 
 def _lower_keys(mapping: Dict[str, str]) -> Dict[str, str]:
     """Return a case-insensitive mapping by lowering keys."""
     return {k.lower(): v for k, v in mapping.items()}
 
 
-def _read_split_list(split_file: Path) -> List[str]:
+def read_split_list(split_file: Path) -> List[str]:
     """Read image base names (without extension) from a split file."""
     if not split_file.exists():
         return []
@@ -38,11 +39,47 @@ def _read_split_list(split_file: Path) -> List[str]:
 
 def _image_size(image_path: Path) -> Tuple[int, int]:
     """Return (width, height) for an image path using PIL."""
+    from PIL import Image
+
     with Image.open(image_path) as img:
         return img.width, img.height
 
 
-def _parse_csv_boxes(csv_path: Path) -> List[Dict]:
+def find_image(images_dir: Path, stem: str) -> Optional[Path]:
+    """Return the image file for a stem, trying JPG, then PNG, then BMP."""
+    for suffix in (".jpg", ".png", ".bmp"):
+        img_path = images_dir / f"{stem}{suffix}"
+        if img_path.exists():
+            return img_path
+    return None
+
+
+def _resolve_image(subcategory_dir: Path, stem: str) -> Optional[Tuple[str, int, int]]:
+    """Return (path relative to subcategory_dir, width, height) for a stem, or None.
+    
+    Image files are used when present. Augmented samples kept in a packed
+    store (see scripts/augment_dataset.py) have no image file; their per-image
+    JSON carries a "pack_index" and a file_name such as "packed/train.u8#12"
+    that points at the record in the pack, and that reference is returned.
+    """
+    img_path = find_image(subcategory_dir / "images", stem)
+    if img_path is not None:
+        width, height = _image_size(img_path)
+        return f"images/{img_path.name}", width, height
+    
+    json_path = subcategory_dir / "json" / f"{stem}.json"
+    if not json_path.exists():
+        return None
+    with open(json_path, 'r', encoding='utf-8') as f:
+        record = json.load(f)
+    images = record.get("images") or []
+    if not images or "pack_index" not in images[0]:
+        return None
+    image = images[0]
+    return image["file_name"], int(image["width"]), int(image["height"])
+
+
+def parse_csv_boxes(csv_path: Path) -> List[Dict]:
     """Parse a single per-image CSV file and return COCO-style bboxes.
     
     The parser is resilient to header variants by using case-insensitive
@@ -116,20 +153,36 @@ def _load_labelmap(labelmap_path: Path) -> Dict[int, str]:
     return {item['label_id']: item['object_name'] for item in labelmap}
 
 
+def _latest_mtime(directory: Path) -> float:
+    """Return the newest modification time of a directory and its entries."""
+    if not directory.exists():
+        return 0.0
+    latest = directory.stat().st_mtime
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            latest = max(latest, entry.stat().st_mtime)
+    return latest
+
+
+def _is_up_to_date(out_path: Path, input_mtime: float) -> bool:
+    """Return True if out_path exists and is newer than every input."""
+    return out_path.exists() and out_path.stat().st_mtime >= input_mtime
+
+
 def _collect_annotations_for_subcategory(
     category_root: Path,
     subcategory: str,
     split: str,
     labelmap: Dict[int, str],
-) -> Tuple[List[Dict], List[Dict], List[Dict]]:
-    """Collect COCO dictionaries for images, annotations, and categories for a subcategory."""
+) -> Tuple[CocoRecordStore, List[Dict]]:
+    """Collect images and annotations into a record store, plus categories, for a subcategory."""
     subcategory_dir = category_root / subcategory
     images_dir = subcategory_dir / "images"
     annotations_dir = subcategory_dir / "csv"
     sets_dir = subcategory_dir / "sets"
     
     split_file = sets_dir / f"{split}.txt"
-    image_stems = set(_read_split_list(split_file))
+    image_stems = set(read_split_list(split_file))
     
     if not image_stems:
         # Fall back to all images if no split file
@@ -137,8 +190,7 @@ def _collect_annotations_for_subcategory(
         image_stems.update({p.stem for p in images_dir.glob("*.png")})
         image_stems.update({p.stem for p in images_dir.glob("*.bmp")})
     
-    images: List[Dict] = []
-    anns: List[Dict] = []
+    store = CocoRecordStore()
     
     # Get category name from labelmap
     category_name = labelmap.get(1, subcategory)  # Default to subcategory name
@@ -151,39 +203,32 @@ def _collect_annotations_for_subcategory(
     ann_id_counter = 1
     
     for stem in sorted(image_stems):
-        img_path = images_dir / f"{stem}.jpg"
-        if not img_path.exists():
-            # Try PNG fallback
-            img_path = images_dir / f"{stem}.png"
-            if not img_path.exists():
-                # Try BMP fallback
-                img_path = images_dir / f"{stem}.bmp"
-                if not img_path.exists():
-                    continue
+        resolved = _resolve_image(subcategory_dir, stem)
+        if resolved is None:
+            continue
         
-        width, height = _image_size(img_path)
-        images.append({
-            "id": image_id_counter,
-            "file_name": f"{category_root.name}/{subcategory}/images/{img_path.name}",
-            "width": width,
-            "height": height,
-        })
+        file_name, width, height = resolved
+        store.add_image(
+            image_id_counter,
+            f"{category_root.name}/{subcategory}/{file_name}",
+            width,
+            height,
+        )
         
         csv_path = annotations_dir / f"{stem}.csv"
-        for box in _parse_csv_boxes(csv_path):
-            anns.append({
-                "id": ann_id_counter,
-                "image_id": image_id_counter,
-                "category_id": box["category_id"],
-                "bbox": box["bbox"],
-                "area": box["area"],
-                "iscrowd": 0,
-            })
+        for box in parse_csv_boxes(csv_path):
+            store.add_annotation(
+                ann_id_counter,
+                image_id_counter,
+                box["category_id"],
+                box["bbox"],
+                box["area"],
+            )
             ann_id_counter += 1
         
         image_id_counter += 1
     
-    return images, anns, categories
+    return store, categories
 
 
 def _collect_annotations_combined(
@@ -191,10 +236,9 @@ def _collect_annotations_combined(
     subcategories: List[str],
     split: str,
     labelmap: Dict[int, str],
-) -> Tuple[List[Dict], List[Dict], List[Dict]]:
-    """Collect COCO dictionaries for all subcategories combined."""
-    all_images: List[Dict] = []
-    all_anns: List[Dict] = []
+) -> Tuple[CocoRecordStore, List[Dict]]:
+    """Collect a record store and categories for all subcategories combined."""
+    store = CocoRecordStore()
     all_categories: List[Dict] = []
     
     category_id_map = {}  # Map subcategory name to COCO category_id
@@ -210,7 +254,7 @@ def _collect_annotations_combined(
         sets_dir = subcategory_dir / "sets"
         
         split_file = sets_dir / f"{split}.txt"
-        image_stems = set(_read_split_list(split_file))
+        image_stems = set(read_split_list(split_file))
         
         if not image_stems:
             image_stems = {p.stem for p in images_dir.glob("*.jpg")}
@@ -230,49 +274,47 @@ def _collect_annotations_combined(
         coco_category_id = category_id_map[subcategory]
         
         for stem in sorted(image_stems):
-            img_path = images_dir / f"{stem}.jpg"
-            if not img_path.exists():
-                img_path = images_dir / f"{stem}.png"
-                if not img_path.exists():
-                    img_path = images_dir / f"{stem}.bmp"
-                    if not img_path.exists():
-                        continue
+            resolved = _resolve_image(subcategory_dir, stem)
+            if resolved is None:
+                continue
             
-            width, height = _image_size(img_path)
-            all_images.append({
-                "id": image_id_counter,
-                "file_name": f"{category_root.name}/{subcategory}/images/{img_path.name}",
-                "width": width,
-                "height": height,
-            })
+            file_name, width, height = resolved
+            store.add_image(
+                image_id_counter,
+                f"{category_root.name}/{subcategory}/{file_name}",
+                width,
+                height,
+            )
             
             csv_path = annotations_dir / f"{stem}.csv"
-            for box in _parse_csv_boxes(csv_path):
+            for box in parse_csv_boxes(csv_path):
                 # Map CSV category_id to COCO category_id
                 # For classification tasks, CSV category_id might be different
                 # We use the subcategory's COCO category_id
-                all_anns.append({
-                    "id": ann_id_counter,
-                    "image_id": image_id_counter,
-                    "category_id": coco_category_id,
-                    "bbox": box["bbox"],
-                    "area": box["area"],
-                    "iscrowd": 0,
-                })
+                store.add_annotation(
+                    ann_id_counter,
+                    image_id_counter,
+                    coco_category_id,
+                    box["bbox"],
+                    box["area"],
+                )
                 ann_id_counter += 1
             
             image_id_counter += 1
     
-    return all_images, all_anns, all_categories
+    return store, all_categories
 
 
 def _build_coco_dict(
-    images: List[Dict],
-    anns: List[Dict],
+    store: CocoRecordStore,
     categories: List[Dict],
     description: str,
 ) -> Dict:
-    """Build a complete COCO dict from components."""
+    """Build a complete COCO dict from components.
+
+    Images and annotations are lazy iterators over the store; write the
+    result with _write_coco() rather than json.dumps().
+    """
     return {
         "info": {
             "year": 2025,
@@ -280,21 +322,32 @@ def _build_coco_dict(
             "description": description,
             "url": "https://storage.googleapis.com/ibeans/",
         },
-        "images": images,
-        "annotations": anns,
+        "images": store.iter_images(),
+        "annotations": store.iter_annotations(),
         "categories": categories,
         "licenses": [],
     }
 
 
+def _write_coco(out_path: Path, coco: Dict) -> None:
+    """Stream a COCO dict built by _build_coco_dict() to out_path."""
+    with out_path.open("w", encoding="utf-8") as f:
+        write_coco_json(f, coco)
+
+
 def convert(
     root: Path,
     out_dir: Path,
     category: str,
     splits: List[str],
     combined: bool = False,
+    incremental: bool = False,
 ) -> None:
-    """Convert selected category and splits to COCO JSON files."""
+    """Convert selected category and splits to COCO JSON files.
+
+    With incremental=True, outputs newer than their split file, images, CSV
+    and JSON annotations are left untouched.
+    """
     out_dir.mkdir(parents=True, exist_ok=True)
     
     category_root = root / category
@@ -310,34 +363,58 @@ def convert(
         print(f"Warning: No subcategories found in {category_root}")
         return
     
+    # Newest input per subcategory (images/, csv/ and json/ contents), computed once
+    source_mtimes: Dict[str, float] = {}
+    
+    def input_mtime(subcategory: str, split: str) -> float:
+        subcategory_dir = category_root / subcategory
+        if subcategory not in source_mtimes:
+            source_mtimes[subcategory] = max(
+                _latest_mtime(subcategory_dir / "images"),
+                _latest_mtime(subcategory_dir / "csv"),
+                # json/ supplies image sizes for pack-backed augmented records
+                _latest_mtime(subcategory_dir / "json"),
+            )
+        split_file = subcategory_dir / "sets" / f"{split}.txt"
+        split_mtime = split_file.stat().st_mtime if split_file.exists() else 0.0
+        return max(source_mtimes[subcategory], split_mtime)
+    
     if combined:
         # Generate combined COCO files for all subcategories
         for split in splits:
-            images, anns, categories = _collect_annotations_combined(
+            out_path = out_dir / f"combined_instances_{split}.json"
+            if incremental and _is_up_to_date(
+                out_path, max(input_mtime(sub, split) for sub in subcategories)
+            ):
+                print(f"Skipped {out_path} (up to date)")
+                continue
+            store, categories = _collect_annotations_combined(
                 category_root, subcategories, split, labelmap
             )
             desc = f"Bean Disease Uganda {category} {split} split (combined)"
-            coco = _build_coco_dict(images, anns, categories, desc)
-            out_path = out_dir / f"combined_instances_{split}.json"
-            out_path.write_text(json.dumps(coco, indent=2), encoding="utf-8")
-            print(f"Generated {out_path} with {len(images)} images and {len(anns)} annotations")
+            coco = _build_coco_dict(store, categories, desc)
+            _write_coco(out_path, coco)
+            print(f"Generated {out_path} with {store.num_images} images and {store.num_annotations} annotations")
     else:
         # Generate separate COCO files for each subcategory
         for subcategory in subcategories:
             for split in splits:
-                images, anns, categories = _collect_annotations_for_subcategory(
+                out_path = out_dir / f"{subcategory}_instances_{split}.json"
+                if incremental and _is_up_to_date(out_path, input_mtime(subcategory, split)):
+                    print(f"Skipped {out_path} (up to date)")
+                    continue
+                store, categories = _collect_annotations_for_subcategory(
                     category_root, subcategory, split, labelmap
                 )
                 desc = f"Bean Disease Uganda {category} {subcategory} {split} split"
-                coco = _build_coco_dict(images, anns, categories, desc)
-                out_path = out_dir / f"{subcategory}_instances_{split}.json"
-                out_path.write_text(json.dumps(coco, indent=2), encoding="utf-8")
-                print(f"Generated {out_path} with {len(images)} images and {len(anns)} annotations")
+                coco = _build_coco_dict(store, categories, desc)
+                _write_coco(out_path, coco)
+                print(f"Generated {out_path} with {store.num_images} images and {store.num_annotations} annotations")
 
 
-def main() -> int:
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None) -> int:
     """Entry point for the converter CLI."""
-    parser = argparse.ArgumentParser(description=__doc__)
+    parser = argparse.ArgumentParser(prog=prog, description=__doc__)
     parser.add_argument(
         "--root",
         type=Path,
@@ -369,8 +446,13 @@ def main() -> int:
         action="store_true",
         help="Generate combined COCO files for all subcategories",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip outputs that are newer than their images, CSVs, JSONs and split file",
+    )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     convert(
         root=Path(args.root),
@@ -378,6 +460,7 @@ def main() -> int:
         category=args.category,
         splits=args.splits,
         combined=args.combined,
+        incremental=args.incremental,
     )
     return 0
 
@@ -13,6 +13,7 @@ Usage:
 Note: This script processes the original data structure in data/origin/.
 For standardized structure, use scripts/reorganize_dataset.py and scripts/convert_to_coco.py.
 """
+import argparse
 import os
 import json
 import random
@@ -174,8 +175,21 @@ def process_directory(root_dir=None):
                     
                     print(f"Generated: {json_path}")
 
+def main(argv=None, prog=None):
+    """Entry point for the per-image annotation generator CLI"""
+    parser = argparse.ArgumentParser(
+        prog=prog, description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "root_dir",
+        nargs="?",
+        default=None,
+        help="Dataset root directory (default: parent directory of script)",
+    )
+    args = parser.parse_args(argv)
+    process_directory(args.root_dir)
+    print("All COCO JSON files generated successfully!")
+    return 0
+
 if __name__ == "__main__":
-    import sys
-    root_dir = sys.argv[1] if len(sys.argv) > 1 else None
-    process_directory(root_dir)
-    print("All COCO JSON files generated successfully!") 
\ No newline at end of file
+    raise SystemExit(main())
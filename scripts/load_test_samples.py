@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Load-test a running sample server (see scripts/serve_samples.py).
+
+Sends batched /samples requests from concurrent clients and reports p50/p99
+request latency and throughput in requests and samples per second.
+
+License: CC BY 4.0 (see LICENSE). This script is distributed alongside the
+dataset and follows the same license terms. Cite the original dataset in publications.
+
+Usage examples:
+    python scripts/load_test_samples.py --url http://127.0.0.1:8765 \
+        --requests 500 --concurrency 8 --batch-size 16
+    python scripts/load_test_samples.py --split val --random
+"""
+
+import argparse
+import json
+import random
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+
+def _get_json(url: str) -> Dict:
+    with urllib.request.urlopen(url) as resp:
+        return json.loads(resp.read())
+
+
+def _post_samples(url: str, stems: List[str], size: int) -> float:
+    """POST one batch and return its latency in seconds."""
+    body = json.dumps({"stems": stems, "size": size}).encode("utf-8")
+    req = urllib.request.Request(
+        f"{url}/samples", data=body, headers={"Content-Type": "application/json"}
+    )
+    start = time.perf_counter()
+    with urllib.request.urlopen(req) as resp:
+        payload = json.loads(resp.read())
+    elapsed = time.perf_counter() - start
+    if len(payload["samples"]) != len(stems):
+        raise RuntimeError(f"Expected {len(stems)} samples, got {len(payload['samples'])}")
+    return elapsed
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run(
+    url: str,
+    split: str,
+    requests: int,
+    concurrency: int,
+    batch_size: int,
+    size: int,
+    shuffle: bool,
+    seed: int,
+) -> Dict:
+    """Run the load test and return summary statistics."""
+    stems = _get_json(f"{url}/index?split={split}").get("stems", [])
+    if not stems:
+        raise SystemExit(f"Split {split!r} is empty on {url}")
+
+    rng = random.Random(seed)
+    batches = []
+    for i in range(requests):
+        if shuffle:
+            batches.append(rng.sample(stems, min(batch_size, len(stems))))
+        else:
+            start = (i * batch_size) % len(stems)
+            batches.append([stems[(start + j) % len(stems)] for j in range(batch_size)])
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(lambda b: _post_samples(url, b, size), batches))
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "samples": sum(len(b) for b in batches),
+        "wall_s": wall,
+        "p50_ms": _percentile(latencies, 50) * 1000.0,
+        "p99_ms": _percentile(latencies, 99) * 1000.0,
+        "max_ms": latencies[-1] * 1000.0,
+        "requests_per_s": requests / wall,
+        "samples_per_s": sum(len(b) for b in batches) / wall,
+        "cache": _get_json(f"{url}/health").get("cache", {}),
+    }
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None) -> int:
+    """Entry point for the load-test CLI."""
+    parser = argparse.ArgumentParser(prog=prog, description=__doc__)
+    parser.add_argument(
+        "--url",
+        type=str,
+        default="http://127.0.0.1:8765",
+        help="Base URL of the sample server (default: http://127.0.0.1:8765)",
+    )
+    parser.add_argument(
+        "--split",
+        type=str,
+        default="train",
+        help="Split to draw stems from (default: train)",
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=200,
+        help="Total number of batched requests (default: 200)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Number of concurrent clients (default: 8)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=16,
+        help="Samples per request (default: 16)",
+    )
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=224,
+        help="Requested square output size in pixels (default: 224)",
+    )
+    parser.add_argument(
+        "--random",
+        action="store_true",
+        help="Draw random batches instead of walking the split in order",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed for --random batch selection (default: 0)",
+    )
+
+    args = parser.parse_args(argv)
+
+    stats = run(
+        url=args.url.rstrip("/"),
+        split=args.split,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        size=args.size,
+        shuffle=args.random,
+        seed=args.seed,
+    )
+    print(f"Requests: {stats['requests']} ({stats['samples']} samples) in {stats['wall_s']:.2f} s")
+    print(f"Latency: p50 {stats['p50_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms, max {stats['max_ms']:.1f} ms")
+    print(f"Throughput: {stats['requests_per_s']:.1f} req/s, {stats['samples_per_s']:.1f} samples/s")
+    print(f"Cache: {json.dumps(stats['cache'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
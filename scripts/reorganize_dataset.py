@@ -10,6 +10,7 @@ Usage:
     
     root_dir: 数据集根目录（默认为当前目录）
 """
+import argparse
 import json
 import shutil
 from pathlib import Path
@@ -152,8 +153,17 @@ def reorganize_dataset(root_dir):
         print(f"  总计: {total}")
     print("=" * 60)
 
+def main(argv=None, prog=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(
+        prog=prog, description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('root_dir', nargs='?', default='.',
+                        help='数据集根目录（默认为当前目录）')
+    args = parser.parse_args(argv)
+    reorganize_dataset(args.root_dir)
+    return 0
+
 if __name__ == '__main__':
-    import sys
-    root_dir = sys.argv[1] if len(sys.argv) > 1 else '.'
-    reorganize_dataset(root_dir)
+    raise SystemExit(main())
 
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+Serve decoded, resized and normalized Bean Disease Uganda samples over HTTP.
+
+The server indexes `sets/` and `json/` for every subcategory once at startup,
+keeps a warm process pool for image decoding and caches decoded samples in a
+memory-capped LRU cache, so clients only pay for the request itself.
+
+License: CC BY 4.0 (see LICENSE). This script is distributed alongside the
+dataset and follows the same license terms. Cite the original dataset in publications.
+
+Endpoints (localhost only):
+    GET  /health                  -> {"status": "ok", "cache": {...}}
+    GET  /index[?split=train]     -> subcategories, split sizes and stems
+    POST /samples                 -> batch of samples, request body:
+         {"stems": ["healthy_train_0", ...], "size": 224}
+      or {"split": "train", "offset": 0, "limit": 32, "size": 224}
+
+Each returned sample carries its label and the image as base64-encoded
+float32 data in CHW order, normalized with the configured mean/std.
+
+Usage examples:
+    python scripts/serve_samples.py --root . --port 8765 --workers 4
+    python scripts/serve_samples.py --root . --cache-mb 512 --size 224
+"""
+
+import argparse
+import base64
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from convert_to_coco import find_image, read_split_list
+
+# ImageNet statistics, the usual default for classification backbones.
+DEFAULT_MEAN = (0.485, 0.456, 0.406)
+DEFAULT_STD = (0.229, 0.224, 0.225)
+MAX_BATCH = 256
+# Output size bounds; 2048 x 2048 float32 CHW is already 48 MB per sample.
+MIN_SIZE = 1
+MAX_SIZE = 2048
+# Bound on the decoded float32 data of one response (before base64), so a
+# single request cannot make the server hold MAX_BATCH x MAX_SIZE samples.
+MAX_RESPONSE_BYTES = 256 * 1024 * 1024
+# Request bodies are small JSON objects; anything larger is rejected unread.
+MAX_REQUEST_BYTES = 1024 * 1024
+
+
+def _int_field(request: Dict, key: str, default: int, low: int, high: int) -> int:
+    """Return request[key] as an int in [low, high]; raise ValueError otherwise."""
+    value = request.get(key, default)
+    # bool is an int subclass, but {"size": true} is not a size.
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f"'{key}' must be an integer")
+    if not low <= value <= high:
+        raise ValueError(f"'{key}' must be between {low} and {high}, got {value}")
+    return value
+
+
+def _read_label(json_path: Path, default_name: str) -> Tuple[int, str]:
+    """Return (category_id, category_name) from a per-image JSON record."""
+    with open(json_path, "r", encoding="utf-8") as f:
+        record = json.load(f)
+    anns = record.get("annotations") or []
+    cats = {c["id"]: c["name"] for c in record.get("categories") or []}
+    if not anns:
+        return 0, default_name
+    category_id = int(anns[0]["category_id"])
+    return category_id, cats.get(category_id, default_name)
+
+
+class SampleIndex:
+    """In-memory index of images, labels and splits for one category root."""
+
+    def __init__(self, category_root: Path) -> None:
+        self.category_root = category_root
+        self.entries: Dict[str, Dict] = {}
+        self.splits: Dict[str, List[str]] = {}
+        self.subcategories: List[str] = []
+        self._build()
+
+    def _build(self) -> None:
+        subcategories = sorted(
+            d.name for d in self.category_root.iterdir()
+            if d.is_dir() and d.name not in ["csv", "json", "images", "sets", "segmentations"]
+        )
+        self.subcategories = subcategories
+
+        for subcategory in subcategories:
+            subcategory_dir = self.category_root / subcategory
+            images_dir = subcategory_dir / "images"
+            json_dir = subcategory_dir / "json"
+
+            # Resolve each stem like convert_to_coco.py does (JPG, then PNG,
+            # then BMP) so both tools agree on which file backs a stem.
+            stems = sorted({p.stem for p in images_dir.iterdir()} if images_dir.exists() else ())
+            for stem in stems:
+                img_path = find_image(images_dir, stem)
+                if img_path is None:
+                    continue
+                json_path = json_dir / f"{stem}.json"
+                if json_path.exists():
+                    category_id, label = _read_label(json_path, subcategory)
+                else:
+                    category_id, label = 0, subcategory
+                self.entries[stem] = {
+                    "path": str(img_path),
+                    "subcategory": subcategory,
+                    "label": label,
+                    "category_id": category_id,
+                }
+
+            sets_dir = subcategory_dir / "sets"
+            for split_file in sorted(sets_dir.glob("*.txt")) if sets_dir.exists() else []:
+                stems = [s for s in read_split_list(split_file) if s in self.entries]
+                self.splits.setdefault(split_file.stem, []).extend(stems)
+
+    def summary(self, split: Optional[str] = None) -> Dict:
+        """Return a JSON-serializable description of the index."""
+        result: Dict = {
+            "subcategories": self.subcategories,
+            "images": len(self.entries),
+            "splits": {name: len(stems) for name, stems in self.splits.items()},
+        }
+        if split is not None:
+            result["stems"] = self.splits.get(split, [])
+        return result
+
+
+class SampleCache:
+    """Thread-safe LRU cache of encoded samples bounded by total byte size."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, int]) -> Optional[str]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple[str, int], value: str) -> None:
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.current_bytes -= len(old)
+            self._data[key] = value
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def _warm_worker() -> None:
+    """Import PIL once per worker so the first request does not pay for it."""
+    from PIL import Image  # noqa: F401
+
+
+def _load_sample(
+    image_path: str,
+    size: int,
+    mean: Sequence[float],
+    std: Sequence[float],
+) -> str:
+    """Decode, resize and normalize an image; return base64 float32 CHW data."""
+    from PIL import Image
+
+    with Image.open(image_path) as img:
+        rgb = img.convert("RGB").resize((size, size), Image.BILINEAR)
+
+    planes = []
+    for band, m, s in zip(rgb.split(), mean, std):
+        scale = 1.0 / (255.0 * s)
+        offset = -m / s
+        # PIL evaluates linear point() functions natively on mode "F" images.
+        planes.append(band.convert("F").point(lambda v, a=scale, b=offset: v * a + b).tobytes())
+    # Encode in the worker so cache hits are served without re-encoding.
+    return base64.b64encode(b"".join(planes)).decode("ascii")
+
+
+class SampleService:
+    """Resolve batched sample requests against the index, cache and worker pool."""
+
+    def __init__(
+        self,
+        index: SampleIndex,
+        cache: SampleCache,
+        workers: int,
+        default_size: int,
+        mean: Sequence[float],
+        std: Sequence[float],
+    ) -> None:
+        self.index = index
+        self.cache = cache
+        self.workers = workers
+        self.default_size = default_size
+        self.mean = tuple(mean)
+        self.std = tuple(std)
+        self._pool_lock = threading.Lock()
+        self.pool = self._start_pool()
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        """Create a worker pool and start every worker up front."""
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        for future in [pool.submit(_warm_worker) for _ in range(self.workers)]:
+            future.result()
+        return pool
+
+    def _replace_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Swap in a fresh pool after a worker died, once per broken pool."""
+        with self._pool_lock:
+            if self.pool is not broken:
+                return  # another request thread already replaced it
+            broken.shutdown(wait=False)
+            self.pool = self._start_pool()
+
+    def close(self) -> None:
+        """Shut down the worker pool."""
+        self.pool.shutdown()
+
+    def parse_request(self, request: object) -> Tuple[List[str], int]:
+        """Validate a request body and return (stems, size).
+
+        Raises ValueError for malformed bodies and KeyError for unknown stems.
+        """
+        if not isinstance(request, dict):
+            raise ValueError("Request body must be a JSON object")
+        size = _int_field(request, "size", self.default_size, MIN_SIZE, MAX_SIZE)
+        if "stems" in request:
+            stems = request["stems"]
+            if not isinstance(stems, list) or not all(isinstance(s, str) for s in stems):
+                raise ValueError("'stems' must be a list of strings")
+        else:
+            split = request.get("split", "train")
+            if not isinstance(split, str):
+                raise ValueError("'split' must be a string")
+            offset = _int_field(request, "offset", 0, 0, 2 ** 31)
+            limit = _int_field(request, "limit", 32, 1, MAX_BATCH)
+            stems = self.index.splits.get(split, [])[offset:offset + limit]
+        if len(stems) > MAX_BATCH:
+            raise ValueError(f"Batch too large: {len(stems)} > {MAX_BATCH}")
+        response_bytes = len(stems) * 3 * size * size * 4
+        if response_bytes > MAX_RESPONSE_BYTES:
+            raise ValueError(
+                f"Response too large: {len(stems)} samples at size {size} need "
+                f"{response_bytes} bytes > {MAX_RESPONSE_BYTES}; lower 'size' or the batch"
+            )
+        missing = [s for s in stems if s not in self.index.entries]
+        if missing:
+            raise KeyError(f"Unknown stems: {', '.join(missing[:5])}")
+        return stems, size
+
+    def fetch(self, stems: List[str], size: int) -> List[Dict]:
+        """Return samples for stems, decoding cache misses on the worker pool."""
+        payloads: Dict[str, str] = {}
+        pending = []
+        for stem in stems:
+            cached = self.cache.get((stem, size))
+            if cached is not None:
+                payloads[stem] = cached
+            elif stem not in payloads:
+                payloads[stem] = ""
+                pending.append(stem)
+
+        pool = self.pool
+        try:
+            futures = [
+                (stem, pool.submit(
+                    _load_sample, self.index.entries[stem]["path"], size, self.mean, self.std
+                ))
+                for stem in pending
+            ]
+            for stem, future in futures:
+                data = future.result()
+                self.cache.put((stem, size), data)
+                payloads[stem] = data
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); the executor rejects all further
+            # work, so replace it before failing this request.
+            self._replace_pool(pool)
+            raise
+
+        samples = []
+        for stem in stems:
+            entry = self.index.entries[stem]
+            samples.append({
+                "stem": stem,
+                "subcategory": entry["subcategory"],
+                "label": entry["label"],
+                "category_id": entry["category_id"],
+                "shape": [3, size, size],
+                "dtype": "float32",
+                "data": payloads[stem],
+            })
+        return samples
+
+
+class SampleRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end for SampleService."""
+
+    service: SampleService
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        # Per-request logging dominates latency under load; keep the server quiet.
+        pass
+
+    def _send_json(self, status: int, payload: Dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/health":
+            self._send_json(200, {"status": "ok", "cache": self.service.cache.stats()})
+        elif url.path == "/index":
+            split = query.get("split", [None])[0]
+            self._send_json(200, self.service.index.summary(split))
+        else:
+            self._send_json(404, {"error": f"Unknown path: {url.path}"})
+
+    def do_POST(self) -> None:
+        if urlparse(self.path).path != "/samples":
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if not 0 <= length <= MAX_REQUEST_BYTES:
+                raise ValueError(
+                    f"Content-Length must be between 0 and {MAX_REQUEST_BYTES}, got {length}"
+                )
+            request = json.loads(self.rfile.read(length) or b"{}")
+            stems, size = self.service.parse_request(request)
+        except (ValueError, KeyError) as exc:
+            self._send_json(400, {"error": exc.args[0] if exc.args else str(exc)})
+            return
+        try:
+            samples = self.service.fetch(stems, size)
+        except Exception as exc:  # noqa: BLE001 - worker errors must not drop the connection
+            self._send_json(500, {"error": f"Failed to load samples: {exc}"})
+            return
+        self._send_json(200, {"samples": samples})
+
+
+def serve(
+    root: Path,
+    category: str,
+    host: str,
+    port: int,
+    workers: int,
+    cache_mb: int,
+    size: int,
+) -> None:
+    """Build the index, start the worker pool and serve until interrupted."""
+    index = SampleIndex(root / category)
+    cache = SampleCache(cache_mb * 1024 * 1024)
+    service = SampleService(index, cache, workers, size, DEFAULT_MEAN, DEFAULT_STD)
+    SampleRequestHandler.service = service
+    server = ThreadingHTTPServer((host, port), SampleRequestHandler)
+    server.daemon_threads = True
+    print(f"Indexed {len(index.entries)} images in {len(index.subcategories)} subcategories")
+    print(f"Serving on http://{host}:{port} with {workers} workers and {cache_mb} MB cache")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None) -> int:
+    """Entry point for the sample server CLI."""
+    parser = argparse.ArgumentParser(prog=prog, description=__doc__)
+    parser.add_argument(
+        "--root",
+        type=Path,
+        default=Path(__file__).resolve().parent.parent,
+        help="Dataset root containing category subfolders (default: dataset root)",
+    )
+    parser.add_argument(
+        "--category",
+        type=str,
+        default="beans",
+        help="Category to serve (default: beans)",
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Interface to bind (default: 127.0.0.1)",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8765,
+        help="Port to listen on (default: 8765)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of decoding worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--cache-mb",
+        type=int,
+        default=1024,
+        help="Memory cap for the decoded sample cache in MB (default: 1024)",
+    )
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=224,
+        help=f"Default square output size in pixels, {MIN_SIZE}..{MAX_SIZE} (default: 224)",
+    )
+
+    args = parser.parse_args(argv)
+    if not MIN_SIZE <= args.size <= MAX_SIZE:
+        parser.error(f"--size must be between {MIN_SIZE} and {MAX_SIZE}")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    serve(
+        root=Path(args.root),
+        category=args.category,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        cache_mb=args.cache_mb,
+        size=args.size,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())